@@ -24,11 +24,19 @@ if os.environ.get("CI") == "true" or os.environ.get("GITHUB_ACTIONS") == "true":
 
 print("[DEBUG] 脚本开始执行...", flush=True)
 
+import asyncio
+import contextlib
+import functools
+import hashlib
 import json
+import random
 import re
-import time
-from datetime import datetime, timedelta
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 
 # 时区处理
 try:
@@ -42,9 +50,36 @@ except ImportError:
     except ImportError:
         raise ImportError("需要 zoneinfo (Python 3.9+) 或 pytz 库来处理时区")
 
+# JSON 序列化：优先使用 orjson，未安装时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# HTML 解析：HTTP 直连拿到的页面没有 __NEXT_DATA__ 时用 selectolax 解析，未安装时跳过
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
 print("[DEBUG] 基础模块导入完成", flush=True)
 
-from playwright.sync_api import sync_playwright, Page, Browser
+import httpx
+from playwright.async_api import async_playwright, Page, BrowserContext, TimeoutError as PlaywrightTimeoutError
+
+# Playwright 每次 API 调用都会执行 inspect.stack() 收集调用栈（只用于调试信息和 trace），开销很大
+# 默认在其内部模块中替换为空栈；设置 PW_INSPECT_STACK=1 可恢复原始行为便于排查问题
+if os.environ.get("PW_INSPECT_STACK", "0") != "1":
+    import inspect
+    import types
+    try:
+        from playwright._impl import _connection as _pw_connection, _network as _pw_network
+        _no_stack_inspect = types.SimpleNamespace(**vars(inspect))
+        _no_stack_inspect.stack = lambda context=1: []
+        _pw_connection.inspect = _no_stack_inspect
+        _pw_network.inspect = _no_stack_inspect
+    except (ImportError, AttributeError):
+        pass  # Playwright 内部结构变化时保持原样
 
 print("[DEBUG] Playwright 导入完成", flush=True)
 
@@ -56,16 +91,237 @@ LOGIN_URL = "https://www.nytimes.com/athletic/login"
 # Cookie 存储文件
 COOKIE_FILE = Path("auth_state.json")
 
+# 浏览器持久化用户目录（跨运行保留 Cookie 和 localStorage；启用了请求拦截，
+# Playwright 会关闭 HTTP 缓存，所以这里不保存页面缓存）
+PROFILE_DIR = Path("pw_profile")
+
+# 上次成功启动的浏览器（下次优先尝试，避免依次等待未安装的浏览器启动失败）
+# 环境变量 SCRAPER_BROWSER=chromium/firefox/webkit 可直接指定
+CHOSEN_BROWSER_FILE = Path(".chosen_browser")
+
 # 输出目录
 ARTICLES_DIR = Path("articles")
 ARTICLES_DIR.mkdir(exist_ok=True)
 
-# 索引文件（用于去重，避免重复抓取）
-INDEX_FILE = ARTICLES_DIR / "index.json"
+# 索引文件（用于去重，避免重复抓取），每行一条 {"url": ..., "ts": ...}，只追加写入
+INDEX_FILE = ARTICLES_DIR / "index.jsonl"
+# 旧版索引（整个 dict 一次性写入的 JSON），启动时自动迁移到 INDEX_FILE
+LEGACY_INDEX_FILE = ARTICLES_DIR / "index.json"
+# 正文内容指纹（SimHash），用于识别换了 ID 重新发布的重复文章
+DIGEST_FILE = ARTICLES_DIR / "digests.jsonl"
 
 # 重试配置
 MAX_RETRIES = 10
-RETRY_DELAY = 5  # 秒
+RETRY_DELAY = 1  # 秒，首次重试等待时间，之后指数增长
+RETRY_MAX_DELAY = 30  # 秒
+
+# 并发配置：同时打开的文章页面数（共用一个浏览器上下文），可用 --concurrency N 覆盖
+MAX_CONCURRENCY = 4
+
+# 后台写盘线程数（保存文章与导航下一篇并行）
+WRITER_THREADS = 2
+
+# 每抓取多少篇文章重建一次浏览器上下文（Playwright 的对象要到上下文关闭才释放，避免长时间运行内存持续增长）
+CONTEXT_RECYCLE_EVERY = 25
+
+# 浏览器与 HTTP 直连共用的 User-Agent
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# 请求拦截：爬虫只需要文本，图片、字体、媒体、样式表和第三方统计脚本一律不加载
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+BLOCKED_URL_PATTERNS = [
+    "**/*doubleclick.net/**",
+    "**/*google-analytics.com/**",
+    "**/*chartbeat.com/**",
+    "**/*adsystem.com/**",
+    "**/*googletagmanager.com/**",
+    "**/*nyt.com/ads/**",
+]
+
+# 服务器错误页面检测：在页面内截取标题和正文前 500 个字符（只传回这一小段），再匹配常见提示语
+ERROR_PROBE_JS = "() => [document.title, (document.body ? document.body.innerText : '').slice(0, 500)]"
+ERR_RE = re.compile(r'internal server error|something went wrong|service unavailable|bad gateway|gateway timeout|server error', re.IGNORECASE)
+
+# 内容指纹：按小写字母单词切分（去掉数字和标点），每 3 个词一组计算 64 位 SimHash，
+# 汉明距离不超过 3 视为同一篇文章
+WORD_RE = re.compile(r'[^\W\d_]+')
+SHINGLE_SIZE = 3
+SIMHASH_MAX_DISTANCE = 3
+# 单词太少（比分、简讯等）时指纹区分不开不同文章，不做内容去重
+SIMHASH_MIN_WORDS = 20
+
+# 发布日期解析: "Feb. 6, 2026Updated 12:17 am GMT+8"、"2026-01-30" 等
+DATE_RE = re.compile(r'([a-zA-Z]{3,9})\.?\s+(\d{1,2}),?\s+(\d{4})')
+TIME_RE = re.compile(r'(\d{1,2}):(\d{2})\s*(am|pm)', re.IGNORECASE)
+TZ_RE = re.compile(r'(GMT|UTC)([+-])(\d+)', re.IGNORECASE)
+ISO_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+MONTH_MAP = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4,
+    'may': 5, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+# 文章按英国伦敦时间（GMT/BST）的日期分目录
+LONDON_TZ = ZoneInfo("Europe/London")
+
+# 文章URL格式：/athletic/数字ID/日期/标题/，并排除登录、订阅、作者页等非文章页面
+ARTICLE_URL_RE = re.compile(r'nytimes\.com/athletic/\d+/\d{4}/\d{2}/\d{2}/')
+EXCLUDE_RE = re.compile(r'/(?:login|subscribe|account)|/(?:author|team|league|podcast)/')
+
+# 正文过滤：图片版权、广告等 class，以及段落开头的常见非正文内容
+SKIP_CLASS_RE = re.compile(r'ImageCaption|ImageCredit|ad-slug|showcase')
+SKIP_TEXT_RE = re.compile(r'advertisement|follow|twitter|@|getty images|photo:', re.IGNORECASE)
+
+# 新闻页上的 Athletic 链接选择器（滚动加载时用链接数量判断是否有新内容）
+ATHLETIC_LINK_SELECTOR = 'a[href*="/athletic/"]'
+
+# 新闻页无限滚动：滚到底部并返回当前链接数量，链接数量不再增长时停止
+MAX_SCROLLS = 15
+SCROLL_JS = "sel => { window.scrollTo(0, document.body.scrollHeight); return document.querySelectorAll(sel).length; }"
+
+# 一次 evaluate 在页面内筛选出文章链接并提取标题，返回 [{url, title}]
+LINKS_JS = """({article, exclude}) => {
+    const articleRe = new RegExp(article), excludeRe = new RegExp(exclude);
+    const links = [];
+    for (const a of document.querySelectorAll('a[href*="nytimes.com/athletic/"]')) {
+        const href = a.getAttribute('href');
+        if (!href || !articleRe.test(href) || excludeRe.test(href)) continue;
+        // 优先取链接内部的 h5 等标题元素，否则取链接文本中第一行有意义的文本
+        const headline = a.querySelector('h5, h4, h3, h2, h1');
+        let title = headline ? headline.innerText.trim() : '';
+        if (!title) title = a.innerText.split('\\n').map(l => l.trim()).find(l => l.length > 10) || '';
+        if (title.length > 10) links.push({url: href, title: title.slice(0, 200)});
+    }
+    return links;
+}"""
+
+# 文章页字段选择器：按顺序尝试，取第一个可见的元素
+TITLE_SELECTORS = ['h1', 'article h1', '[data-testid="headline"]', '.headline', '.article-title']
+AUTHOR_SELECTORS = ['[data-testid="byline"]', '.byline', '.author', 'a[href*="/author/"]']
+DATE_SELECTORS = ['time', '[data-testid="timestamp"]', '.publish-date', '.date']
+
+# 正文 p 标签没有特殊 class，而图片版权等有特定 class
+CONTENT_CONTAINER_SELECTOR = 'div.article-content-container'
+CONTENT_SELECTOR = f'{CONTENT_CONTAINER_SELECTOR} > p:not([class])'
+
+# 一次 evaluate 取回标题、作者、日期和正文段落；没有可见元素的字段返回 null
+# 直接子元素中没有正文时，fallback 返回容器内所有 class 不在 SKIP_CLASS_RE 中的 p 的文本
+META_JS = """({title, author, date, content, container, skipClass}) => {
+    const visible = el => el.getClientRects().length > 0 && getComputedStyle(el).visibility !== 'hidden';
+    const pick = sels => {
+        for (const s of sels) {
+            const el = document.querySelector(s);
+            if (el && visible(el)) return el.innerText.trim();
+        }
+        return null;
+    };
+    const paragraphs = Array.from(document.querySelectorAll(content), p => p.innerText.trim()).filter(t => t.length > 10);
+    const fallback = [];
+    const box = paragraphs.length ? null : document.querySelector(container);
+    if (box) {
+        const skip = new RegExp(skipClass);
+        for (const p of box.querySelectorAll('p')) {
+            if (!skip.test(p.className)) fallback.push(p.innerText.trim());
+        }
+    }
+    return {
+        title: pick(title),
+        author: pick(author),
+        published_date: pick(date),
+        paragraphs,
+        fallback,
+    };
+}"""
+
+# 恢复 auth_state.json 中各来源的 localStorage（每个页面加载前执行，只补上缺失的键，
+# 不覆盖页面运行中写入的值）
+LOCAL_STORAGE_JS = """(() => {
+    const origins = %s;
+    for (const {origin, localStorage: items} of origins) {
+        if (origin !== window.location.origin) continue;
+        try {
+            for (const {name, value} of items || []) {
+                if (window.localStorage.getItem(name) === null) window.localStorage.setItem(name, value);
+            }
+        } catch (e) {}
+    }
+})();"""
+
+# 静态资源磁盘缓存（跨运行复用 JS，不缓存动态的文章 HTML；
+# 图片、字体、样式表已被 _block_heavy_resources 拦截，不会走到缓存路由）
+STATIC_CACHE_DIR = Path(".cache_static")
+STATIC_CACHE_PATTERN = "**/*.js"
+
+# 文章页内嵌的 Next.js 数据（HTTP 直连时直接解析，无需渲染页面）
+NEXT_DATA_RE = re.compile(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', re.DOTALL)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_folder_date(date_str: str) -> str | None:
+    """
+    把发布日期字符串解析为伦敦时间的日期 YYYYMMDD，无法解析时返回 None
+    同一批文章的发布日期字符串大量重复，解析结果按输入缓存
+    """
+    # 解析格式: "Feb. 6, 2026Updated 12:17 am GMT+8"
+    # 或类似格式: "Jan. 30, 2026 3:45 pm GMT-5"
+    
+    # 1. 提取日期部分: "Feb. 6, 2026" 或 "January 30, 2026"
+    date_match = DATE_RE.search(date_str)
+    
+    if date_match:
+        month_abbr = date_match.group(1)[:3].lower()
+        day = int(date_match.group(2))
+        year = int(date_match.group(3))
+        
+        if month_abbr in MONTH_MAP:
+            month = MONTH_MAP[month_abbr]
+            
+            # 2. 提取时间部分: "12:17 am" 或 "3:45 pm"
+            hour = 0
+            minute = 0
+            time_match = TIME_RE.search(date_str)
+            if time_match:
+                hour = int(time_match.group(1))
+                minute = int(time_match.group(2))
+                am_pm = time_match.group(3).lower()
+                
+                # 转换为24小时制
+                if am_pm == 'pm' and hour != 12:
+                    hour += 12
+                elif am_pm == 'am' and hour == 12:
+                    hour = 0
+            
+            # 3. 提取时区部分: "GMT+8", "GMT-5", "UTC+8" 等
+            tz_offset_hours = 0
+            tz_match = TZ_RE.search(date_str)
+            if tz_match:
+                sign = tz_match.group(2)
+                offset = int(tz_match.group(3))
+                tz_offset_hours = offset if sign == '+' else -offset
+            
+            try:
+                # 原始时间位于 GMT+offset 时区，直接构造带时区的 datetime 再转换为伦敦时间
+                dt = datetime(year, month, day, hour, minute, tzinfo=timezone(timedelta(hours=tz_offset_hours)))
+                return dt.astimezone(LONDON_TZ).strftime("%Y%m%d")
+            except Exception as e:
+                print(f"  警告: 解析日期时出错: {e}，使用原始日期")
+                # 如果转换失败，使用原始日期
+                return f"{year}{month:02d}{day:02d}"
+    
+    # 如果上面的解析失败，尝试简单的日期格式: "YYYY-MM-DD"
+    match = ISO_RE.search(date_str)
+    if match:
+        # 对于简单格式，假设是 UTC 时间，转换为伦敦时间
+        try:
+            year = int(match.group(1))
+            month = int(match.group(2))
+            day = int(match.group(3))
+            dt_utc = datetime(year, month, day, tzinfo=timezone.utc)
+            return dt_utc.astimezone(LONDON_TZ).strftime("%Y%m%d")
+        except:
+            return f"{match.group(1)}{match.group(2)}{match.group(3)}"
+    
+    return None
 
 
 def get_output_dir_by_date(date_str: str = None) -> Path:
@@ -77,176 +333,193 @@ def get_output_dir_by_date(date_str: str = None) -> Path:
         date_str: 日期字符串，例如 "Feb. 6, 2026Updated 12:17 am GMT+8"
                   如果为None或解析失败，使用今天的日期（伦敦时间）
     """
-    folder_date = None
-    london_tz = ZoneInfo("Europe/London")
-    
-    if date_str:
-        # 尝试解析日期、时间和时区信息
-        month_map = {
-            'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4,
-            'may': 5, 'jun': 6, 'jul': 7, 'aug': 8,
-            'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
-        }
-        
-        # 解析格式: "Feb. 6, 2026Updated 12:17 am GMT+8"
-        # 或类似格式: "Jan. 30, 2026 3:45 pm GMT-5"
-        
-        # 1. 提取日期部分: "Feb. 6, 2026" 或 "January 30, 2026"
-        date_match = re.search(r'([a-zA-Z]{3,9})\.?\s+(\d{1,2}),?\s+(\d{4})', date_str)
-        
-        # 2. 提取时间部分: "12:17 am" 或 "3:45 pm"
-        time_match = re.search(r'(\d{1,2}):(\d{2})\s*(am|pm)', date_str, re.IGNORECASE)
-        
-        # 3. 提取时区部分: "GMT+8", "GMT-5", "UTC+8" 等
-        tz_match = re.search(r'(GMT|UTC)([+-])(\d+)', date_str, re.IGNORECASE)
-        
-        if date_match:
-            month_abbr = date_match.group(1)[:3].lower()
-            day = int(date_match.group(2))
-            year = int(date_match.group(3))
-            
-            if month_abbr in month_map:
-                month = month_map[month_abbr]
-                
-                # 解析时间（如果存在）
-                hour = 0
-                minute = 0
-                if time_match:
-                    hour = int(time_match.group(1))
-                    minute = int(time_match.group(2))
-                    am_pm = time_match.group(3).lower()
-                    
-                    # 转换为24小时制
-                    if am_pm == 'pm' and hour != 12:
-                        hour += 12
-                    elif am_pm == 'am' and hour == 12:
-                        hour = 0
-                
-                # 解析时区偏移（如果存在）
-                tz_offset_hours = 0
-                if tz_match:
-                    sign = tz_match.group(2)
-                    offset = int(tz_match.group(3))
-                    tz_offset_hours = offset if sign == '+' else -offset
-                
-                try:
-                    # 创建带时区的 datetime 对象
-                    # 假设原始时间是 GMT+offset 时区
-                    
-                    # 创建原始时间的 datetime（无时区信息）
-                    dt_naive = datetime(year, month, day, hour, minute)
-                    
-                    # 计算 UTC 时间（GMT = UTC）
-                    # 如果原始时间是 GMT+8，那么 UTC = 原始时间 - 8小时
-                    dt_utc = dt_naive - timedelta(hours=tz_offset_hours)
-                    
-                    # 转换为伦敦时间
-                    dt_utc = dt_utc.replace(tzinfo=ZoneInfo("UTC"))
-                    dt_london = dt_utc.astimezone(london_tz)
-                    
-                    # 根据伦敦时间确定文件夹日期
-                    folder_date = dt_london.strftime("%Y%m%d")
-                except Exception as e:
-                    print(f"  警告: 解析日期时出错: {e}，使用原始日期")
-                    # 如果转换失败，使用原始日期
-                    folder_date = f"{year}{month:02d}{day:02d}"
-        
-        # 如果上面的解析失败，尝试简单的日期格式: "YYYY-MM-DD"
-        if not folder_date:
-            match = re.search(r'(\d{4})-(\d{2})-(\d{2})', date_str)
-            if match:
-                # 对于简单格式，假设是 UTC 时间，转换为伦敦时间
-                try:
-                    year = int(match.group(1))
-                    month = int(match.group(2))
-                    day = int(match.group(3))
-                    dt_utc = datetime(year, month, day, tzinfo=ZoneInfo("UTC"))
-                    dt_london = dt_utc.astimezone(london_tz)
-                    folder_date = dt_london.strftime("%Y%m%d")
-                except:
-                    folder_date = f"{match.group(1)}{match.group(2)}{match.group(3)}"
+    folder_date = _parse_folder_date(date_str) if date_str else None
     
     # 如果解析失败，使用今天的日期（伦敦时间）
     if not folder_date:
-        now_london = datetime.now(london_tz)
+        now_london = datetime.now(LONDON_TZ)
         folder_date = now_london.strftime("%Y%m%d")
     
+    return _ensure_date_dir(folder_date)
+
+
+@functools.lru_cache(maxsize=1024)
+def _ensure_date_dir(folder_date: str) -> Path:
+    """创建日期目录；同一次运行中每个目录只调用一次 mkdir"""
     output_dir = ARTICLES_DIR / folder_date
     output_dir.mkdir(exist_ok=True)
     return output_dir
 
 
+def dump_json(obj) -> bytes:
+    """序列化为缩进 2 格的 UTF-8 JSON（不转义非 ASCII 字符）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def dump_json_line(obj) -> bytes:
+    """序列化为单行紧凑 JSON，末尾带换行（用于 JSONL 文件）"""
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def load_json(data: bytes):
+    """解析 UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def atomic_write(path: Path, data: bytes):
+    """
+    写入同目录临时文件并 fsync，再原子替换目标文件，中途崩溃不会留下写了一半的文件
+    临时文件名由 mkstemp 生成，多个线程同时写同一目标也不会互相覆盖临时文件
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        try:
+            os.chmod(tmp_path, 0o644)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+
+
+def canonicalize(url: str) -> str:
+    """
+    规范化文章 URL 作为去重键：去掉查询参数（utm_source 等）和锚点，域名小写，
+    路径末尾统一保留一个斜杠（与站内链接一致，避免访问时多一次重定向）
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/") + "/"
+    return urlunsplit((parts.scheme, parts.netloc.lower(), path, "", ""))
+
+
 def load_index() -> dict:
-    """加载文章索引 {url: 抓取时间戳}"""
-    if INDEX_FILE.exists():
+    """
+    加载文章索引 {规范化 url: 抓取时间戳}，同一 URL 有多条记录时以最后一条为准
+    旧记录中未规范化的 URL 在这里统一转换，启动时的压缩重写即完成迁移
+    """
+    index = {}
+    
+    if LEGACY_INDEX_FILE.exists():
         try:
-            with open(INDEX_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+            for url, ts in load_json(LEGACY_INDEX_FILE.read_bytes()).items():
+                index[canonicalize(url)] = ts
         except:
             pass
-    return {}
+    
+    if INDEX_FILE.exists():
+        for line in INDEX_FILE.read_bytes().splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = load_json(line)
+                index[canonicalize(record["url"])] = record["ts"]
+            except:
+                continue  # 跳过中断写入的半行
+    
+    return index
 
 
 def save_index(index: dict):
-    """保存文章索引"""
-    with open(INDEX_FILE, "w", encoding="utf-8") as f:
-        json.dump(index, f, ensure_ascii=False, indent=2)
+    """重写整个索引文件（启动时压缩重复记录），并移除已迁移的旧版索引"""
+    atomic_write(INDEX_FILE, b"".join(dump_json_line({"url": url, "ts": ts}) for url, ts in index.items()))
+    LEGACY_INDEX_FILE.unlink(missing_ok=True)
 
 
-def is_article_scraped(index: dict, url: str) -> bool:
-    """检查文章是否已抓取"""
-    return url in index
+def append_index_entry(url: str, ts: str):
+    """向索引文件追加一条记录并 fsync，崩溃时最多丢失正在写的这一条"""
+    with open(INDEX_FILE, "ab") as f:
+        f.write(dump_json_line({"url": url, "ts": ts}))
+        f.flush()
+        os.fsync(f.fileno())
 
 
-def goto_with_retry(page: Page, url: str, max_retries: int = MAX_RETRIES, **kwargs) -> bool:
+def simhash(text: str) -> int | None:
+    """
+    计算正文的 64 位 SimHash，措辞略有改动的文章指纹只相差少数几位
+    单词数少于 SIMHASH_MIN_WORDS 时返回 None（不参与去重）
+    """
+    words = WORD_RE.findall(text.lower())
+    if len(words) < SIMHASH_MIN_WORDS:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    weights = [0] * 64
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def find_near_duplicate(digest: int, digests: dict) -> str | None:
+    """在已有指纹 {url: simhash} 中查找汉明距离足够近的文章，返回其 URL"""
+    for url, other in digests.items():
+        if (digest ^ other).bit_count() <= SIMHASH_MAX_DISTANCE:
+            return url
+    return None
+
+
+def load_digests() -> dict:
+    """加载已保存文章的内容指纹 {url: simhash}"""
+    digests = {}
+    if DIGEST_FILE.exists():
+        for line in DIGEST_FILE.read_bytes().splitlines():
+            try:
+                record = load_json(line)
+                digests[record["url"]] = int(record["simhash"], 16)
+            except:
+                continue  # 跳过空行和中断写入的半行
+    return digests
+
+
+def append_digest(url: str, digest: int):
+    """向指纹文件追加一条记录"""
+    with open(DIGEST_FILE, "ab") as f:
+        f.write(dump_json_line({"url": url, "simhash": f"{digest:016x}"}))
+
+
+def retry_delay(attempt: int) -> float:
+    """指数退避（1s, 2s, 4s ... 封顶 30s），加 ±20% 随机抖动避免并发页面同时重试"""
+    return min(RETRY_MAX_DELAY, RETRY_DELAY * (2 ** attempt)) * (0.8 + 0.4 * random.random())
+
+
+async def goto_with_retry(page: Page, url: str, max_retries: int = MAX_RETRIES,
+                          wait_until: str = "commit", timeout: int = 30000, **kwargs) -> bool:
     """
     带重试的页面导航，处理服务器错误等
+    默认只等到收到响应（commit），页面内容由调用方按需等待具体的选择器
     
     Returns:
         bool: 是否成功加载页面
     """
     for attempt in range(max_retries):
         try:
-            response = page.goto(url, **kwargs)
+            response = await page.goto(url, wait_until=wait_until, timeout=timeout, **kwargs)
             
-            # 检查 HTTP 状态码
-            if response and response.status >= 500:
+            # 以 HTTP 状态码为主要依据：5xx 直接重试
+            if response is not None and response.status >= 500:
                 print(f"  ⚠ HTTP {response.status} 错误，第 {attempt + 1}/{max_retries} 次重试...")
-                time.sleep(RETRY_DELAY)
+                await asyncio.sleep(retry_delay(attempt))
                 continue
             
-            # 等待页面稳定
-            time.sleep(1)
-            
-            # 检查页面是否显示服务器错误（只检查页面开头部分，避免误判）
-            try:
-                # 检查 title 或 h1 是否包含错误信息
-                title = page.title().lower()
-                error_in_title = 'error' in title or 'unavailable' in title
-                
-                # 检查页面是否几乎为空（错误页面通常内容很少）
-                body_text = page.locator('body').inner_text(timeout=5000)
-                is_error_page = False
-                
-                # 错误页面通常很短，且包含特定错误信息
-                if len(body_text) < 500:
-                    body_lower = body_text.lower()
-                    error_phrases = [
-                        'internal server error',
-                        'something went wrong',
-                        'service unavailable',
-                        'bad gateway',
-                        'gateway timeout',
-                        'server error',
-                    ]
-                    is_error_page = any(phrase in body_lower for phrase in error_phrases)
-                
-                if error_in_title or is_error_page:
+            # 拿不到响应（如同页锚点跳转）时才检查页面是否显示服务器错误，2xx/3xx 不再额外探测
+            if response is None:
+                title, body_head = await page.evaluate(ERROR_PROBE_JS)
+                if ERR_RE.search(title) or ERR_RE.search(body_head):
                     print(f"  ⚠ 页面显示服务器错误，第 {attempt + 1}/{max_retries} 次重试...")
-                    time.sleep(RETRY_DELAY)
+                    await asyncio.sleep(retry_delay(attempt))
                     continue
-            except:
-                pass  # 如果无法获取页面文本，继续执行
             
             # 成功
             return True
@@ -256,7 +529,7 @@ def goto_with_retry(page: Page, url: str, max_retries: int = MAX_RETRIES, **kwar
             # 如果是网络错误或超时，重试
             if 'timeout' in error_msg or 'net::' in error_msg or 'navigation' in error_msg:
                 print(f"  ⚠ 加载失败: {e}，第 {attempt + 1}/{max_retries} 次重试...")
-                time.sleep(RETRY_DELAY)
+                await asyncio.sleep(retry_delay(attempt))
                 continue
             else:
                 # 其他错误直接抛出
@@ -266,7 +539,7 @@ def goto_with_retry(page: Page, url: str, max_retries: int = MAX_RETRIES, **kwar
     return False
 
 
-def manual_login_and_save_cookie(p) -> bool:
+async def manual_login_and_save_cookie(p) -> bool:
     """
     打开浏览器让用户手动登录，然后保存 Cookie
     """
@@ -282,28 +555,28 @@ def manual_login_and_save_cookie(p) -> bool:
     
     # 启动浏览器
     try:
-        browser = p.firefox.launch(headless=False, slow_mo=50)
+        browser = await p.firefox.launch(headless=False, slow_mo=50)
     except:
         try:
-            browser = p.chromium.launch(headless=False, slow_mo=50)
+            browser = await p.chromium.launch(headless=False, slow_mo=50)
         except:
-            browser = p.webkit.launch(headless=False, slow_mo=50)
+            browser = await p.webkit.launch(headless=False, slow_mo=50)
     
-    context = browser.new_context(
+    context = await browser.new_context(
         viewport={"width": 1920, "height": 1080},
     )
-    page = context.new_page()
+    page = await context.new_page()
     
     try:
         # 打开登录页面（无超时限制）
-        page.goto(LOGIN_URL, timeout=0)
+        await page.goto(LOGIN_URL, timeout=0)
         
         print("\n>>> 请在浏览器中完成登录...")
         print(">>> 登录成功后，按 Enter 键继续...")
-        input()
+        await asyncio.to_thread(input)
         
         # 保存认证状态（包括 cookies、localStorage 等）
-        context.storage_state(path=str(COOKIE_FILE))
+        await context.storage_state(path=str(COOKIE_FILE))
         
         print(f"\n✓ Cookie 已保存到 {COOKIE_FILE}")
         print("下次运行时将自动使用此 Cookie，无需重新登录")
@@ -314,7 +587,37 @@ def manual_login_and_save_cookie(p) -> bool:
         print(f"保存 Cookie 失败: {e}")
         return False
     finally:
-        browser.close()
+        await browser.close()
+
+
+async def verify_login(page: Page, context: BrowserContext):
+    """打开首页检查登录状态，未登录时只打印警告"""
+    print("🔍 验证登录状态...", flush=True)
+    await page.goto("https://www.nytimes.com/athletic/", wait_until="domcontentloaded", timeout=60000)
+    # 等待页头渲染完成再检查登录按钮，超时则按当前 DOM 检查
+    try:
+        await page.wait_for_load_state("load", timeout=10000)
+    except PlaywrightTimeoutError:
+        pass
+    
+    # 检查是否有登录按钮（未登录状态）或用户菜单（已登录状态）
+    login_button = page.locator('a[href*="/login"], button:has-text("Log In"), a:has-text("Log In")')
+    subscribe_button = page.locator('a[href*="/subscribe"], button:has-text("Subscribe")')
+    
+    # 检查页面上的登录/订阅按钮
+    has_login = await login_button.count() > 0
+    has_subscribe = await subscribe_button.count() > 0
+    
+    # 打印当前页面的 cookies
+    cookies = await context.cookies()
+    athletic_cookies = [c for c in cookies if 'athletic' in c.get('domain', '') or 'nytimes' in c.get('domain', '')]
+    print(f"  当前会话 cookies 数量: {len(cookies)} (athletic/nytimes相关: {len(athletic_cookies)})", flush=True)
+    
+    if has_login or has_subscribe:
+        print("⚠️  警告: 检测到登录/订阅按钮，可能未成功登录！", flush=True)
+        print("  请检查 AUTH_STATE_JSON secret 是否正确设置", flush=True)
+    else:
+        print("✓ 登录状态验证通过", flush=True)
 
 
 def has_saved_cookie() -> bool:
@@ -322,116 +625,268 @@ def has_saved_cookie() -> bool:
     return COOKIE_FILE.exists()
 
 
-def get_article_links(page: Page, debug: bool = True) -> list[dict]:
+async def get_article_links(page: Page, debug: bool = True) -> list[dict]:
     """
     从新闻页面获取所有文章链接
     """
     print(f"正在访问: {NEWS_URL}", flush=True)
-    # 使用 domcontentloaded 而不是 networkidle，避免在 CI 环境中无限等待
-    if not goto_with_retry(page, NEWS_URL, wait_until="domcontentloaded", timeout=120000):
+    # 收到响应即返回，不等 networkidle（统计请求不断，在 CI 环境中可能无限等待），再显式等待文章链接出现
+    if not await goto_with_retry(page, NEWS_URL):
         print("无法加载新闻页面", flush=True)
         return []
-    print("✓ 页面 DOM 加载完成", flush=True)
-    time.sleep(3)
+    try:
+        await page.locator(ATHLETIC_LINK_SELECTOR).first.wait_for(state="attached", timeout=15000)
+        print("✓ 文章链接已加载", flush=True)
+    except PlaywrightTimeoutError:
+        print("  ⚠ 等待文章链接超时", flush=True)
     
-    # 滚动页面以加载更多内容
+    # 滚动页面以加载更多内容，链接数量不再增长时提前结束
     print("滚动页面加载更多内容...", flush=True)
-    for i in range(5):
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        print(f"  滚动 {i+1}/5", flush=True)
-        time.sleep(2)
+    for i in range(MAX_SCROLLS):
+        count = await page.evaluate(SCROLL_JS, ATHLETIC_LINK_SELECTOR)
+        try:
+            await page.wait_for_function(
+                "([sel, n]) => document.querySelectorAll(sel).length > n",
+                arg=[ATHLETIC_LINK_SELECTOR, count],
+                timeout=3000,
+                polling=100,
+            )
+        except PlaywrightTimeoutError:
+            print(f"  滚动 {i+1}/{MAX_SCROLLS}，没有新内容（共 {count} 个链接），停止滚动", flush=True)
+            break
+        print(f"  滚动 {i+1}/{MAX_SCROLLS}，页面已加载更多链接", flush=True)
     
     # 滚回顶部
-    page.evaluate("window.scrollTo(0, 0)")
-    time.sleep(1)
+    await page.evaluate("window.scrollTo(0, 0)")
     
     # 保存页面HTML用于调试
     if debug:
-        html_content = page.content()
+        html_content = await page.content()
         debug_file = ARTICLES_DIR / "debug_page.html"
-        with open(debug_file, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        await asyncio.to_thread(debug_file.write_text, html_content, encoding="utf-8")
         print(f"✓ 页面HTML已保存到 {debug_file}")
     
     articles = []
     seen_urls = set()
     
-    # 文章URL格式：/athletic/数字ID/日期/标题/
-    article_url_pattern = re.compile(r'nytimes\.com/athletic/\d+/\d{4}/\d{2}/\d{2}/')
+    # 文章链接的判断（包含数字ID和日期，排除非文章页面）和标题提取都在页面内完成
+    links = await page.evaluate(LINKS_JS, {"article": ARTICLE_URL_RE.pattern, "exclude": EXCLUDE_RE.pattern})
+    print(f"  找到 {len(links)} 个文章链接")
     
-    all_links = page.locator('a[href*="nytimes.com/athletic/"]').all()
-    print(f"  找到 {len(all_links)} 个 Athletic 链接")
-    
-    for link in all_links:
-        try:
-            href = link.get_attribute("href")
-            if not href or href in seen_urls:
-                continue
-            
-            # 检查是否是文章链接（包含数字ID和日期）
-            if not article_url_pattern.search(href):
-                continue
-            
-            # 排除非文章页面
-            exclude_patterns = ["/login", "/subscribe", "/account", "/author/", "/team/", "/league/", "/podcast/"]
-            if any(pattern in href for pattern in exclude_patterns):
-                continue
-            
-            # 获取标题 - 优先从 h5 标题元素获取
-            title = ""
-            try:
-                # 尝试在链接内部找标题
-                headline = link.locator('h5, h4, h3, h2, h1').first
-                if headline.count() > 0:
-                    title = headline.inner_text().strip()
-            except:
-                pass
-            
-            # 如果没找到标题，使用链接文本
-            if not title:
-                title = link.inner_text().strip()
-                # 清理标题（取第一行有意义的文本）
-                lines = [l.strip() for l in title.split('\n') if l.strip() and len(l.strip()) > 10]
-                title = lines[0] if lines else ""
-            
-            if title and len(title) > 10:
-                seen_urls.add(href)
-                articles.append({
-                    "title": title[:200],
-                    "url": href
-                })
-                print(f"    ✓ {title[:60]}...")
-        except Exception as e:
+    for link in links:
+        link["url"] = canonicalize(link["url"])
+        if link["url"] in seen_urls:
             continue
+        seen_urls.add(link["url"])
+        articles.append(link)
+        print(f"    ✓ {link['title'][:60]}...")
     
     print(f"✓ 找到 {len(articles)} 篇文章")
     return articles
 
 
-def extract_article_content(page: Page, url: str, save_html: bool = False) -> dict:
+async def build_http_client(context: BrowserContext) -> httpx.AsyncClient:
     """
-    提取单篇文章的内容
+    用浏览器会话中的 Cookie 构建 HTTP 客户端
+    整个抓取过程共用一个客户端，复用 TCP/TLS/HTTP2 连接
+    """
+    cookies = httpx.Cookies()
+    for c in await context.cookies():
+        cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+
+    return httpx.AsyncClient(
+        http2=True,
+        cookies=cookies,
+        headers={"User-Agent": USER_AGENT},
+        follow_redirects=True,
+        timeout=30,
+    )
+
+
+def _collect_paragraphs(node) -> list[str]:
+    """递归收集 __NEXT_DATA__ 正文树中 paragraph 节点的文本"""
+    paragraphs = []
+    if isinstance(node, list):
+        for child in node:
+            paragraphs.extend(_collect_paragraphs(child))
+    elif isinstance(node, dict):
+        if node.get("type") == "paragraph":
+            text = node.get("text") or "".join(
+                child.get("text", "") for child in node.get("children", []) if isinstance(child, dict)
+            )
+            text = text.strip()
+            if len(text) > 10:
+                paragraphs.append(text)
+        else:
+            for child in node.values():
+                if isinstance(child, (list, dict)):
+                    paragraphs.extend(_collect_paragraphs(child))
+    return paragraphs
+
+
+def _normalize_published_date(value) -> str:
+    """
+    把 __NEXT_DATA__ 中的发布时间（ISO 字符串或毫秒/秒级时间戳）转换为伦敦时间的页面显示格式，
+    如 "Feb 6, 2026 11:30 pm GMT+0"，与浏览器抓取的日期字符串按同样的规则分目录
+    无法解析时原样返回字符串
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # 毫秒级时间戳大于 1e11（秒级要到公元 5000 年以后才会这么大）
+        try:
+            dt = datetime.fromtimestamp(value / 1000 if value > 1e11 else value, tz=timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return str(value)
+    else:
+        value = str(value)
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
     
+    dt = dt.astimezone(LONDON_TZ)
+    hour = dt.hour % 12 or 12
+    am_pm = "am" if dt.hour < 12 else "pm"
+    offset = int(dt.utcoffset().total_seconds() // 3600)
+    return f"{dt:%b} {dt.day}, {dt.year} {hour}:{dt:%M} {am_pm} GMT{offset:+d}"
+
+
+def parse_next_data(html: str, url: str) -> dict | None:
+    """解析页面内嵌的 __NEXT_DATA__ JSON，结构不符合预期时返回 None"""
+    match = NEXT_DATA_RE.search(html)
+    if not match:
+        return None
+
+    try:
+        article = load_json(match.group(1))["props"]["pageProps"]["article"]
+
+        authors = article.get("authors") or []
+        author = ", ".join(a["name"] for a in authors if isinstance(a, dict) and a.get("name"))
+
+        paragraphs = _collect_paragraphs(article["body"])
+        if not paragraphs:
+            raise KeyError("body")
+
+        published = article.get("published_at") or article.get("date")
+
+        return {
+            "url": url,
+            "scraped_at": datetime.now().isoformat(),
+            "title": article["title"].strip(),
+            "author": author or article.get("byline", ""),
+            "published_date": _normalize_published_date(published) if published else "",
+            "content": "\n\n".join(paragraphs),
+            "paragraph_count": len(paragraphs),
+        }
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return None
+
+
+def parse_article_html(html: str, url: str) -> dict | None:
+    """
+    用 selectolax 解析服务端渲染的文章 HTML，选择器与浏览器渲染时一致
+    未安装 selectolax、找不到标题或正文时返回 None
+    """
+    if LexborHTMLParser is None:
+        return None
+
+    tree = LexborHTMLParser(html)
+
+    def first_text(selectors: list[str]) -> str | None:
+        for selector in selectors:
+            node = tree.css_first(selector)
+            if node is not None:
+                return node.text().strip()
+        return None
+
+    paragraphs = []
+    for node in tree.css(CONTENT_SELECTOR):
+        text = node.text().strip()
+        if len(text) > 10:
+            paragraphs.append(text)
+
+    title = first_text(TITLE_SELECTORS)
+    if not title or not paragraphs:
+        return None
+
+    article_data = {
+        "url": url,
+        "scraped_at": datetime.now().isoformat(),
+        "title": title,
+    }
+    author = first_text(AUTHOR_SELECTORS)
+    if author is not None:
+        article_data["author"] = author
+    published_date = first_text(DATE_SELECTORS)
+    if published_date is not None:
+        article_data["published_date"] = published_date
+    article_data["content"] = "\n\n".join(paragraphs)
+    article_data["paragraph_count"] = len(paragraphs)
+    return article_data
+
+
+async def fetch_article_via_http(client: httpx.AsyncClient, url: str) -> dict | None:
+    """
+    通过 HTTP 直接获取文章：先解析页面内嵌的 __NEXT_DATA__ JSON，
+    没有时再用 selectolax 解析服务端渲染的 HTML
+
+    Returns:
+        文章数据；页面结构不符合预期或请求失败时返回 None（由调用方回退到浏览器渲染）
+    """
+    try:
+        resp = await client.get(url)
+        resp.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"  ⚠ HTTP 直连失败: {e}")
+        return None
+
+    # 解析中出现任何意外错误都只放弃 HTTP 直连，不影响回退到浏览器渲染
+    try:
+        return parse_next_data(resp.text, url) or parse_article_html(resp.text, url)
+    except Exception as e:
+        print(f"  ⚠ HTTP 直连结果解析失败: {e}")
+        return None
+
+
+async def extract_article_content(page: Page, url: str, save_html: bool = False,
+                                  http_client: httpx.AsyncClient = None) -> dict:
+    """
+    提取单篇文章的内容
+    优先通过 HTTP 直连解析 __NEXT_DATA__，失败时回退到浏览器渲染
+
     Args:
-        save_html: 如果为 True，保存文章HTML到文件用于调试
+        save_html: 如果为 True，保存文章HTML到文件用于调试（此时跳过 HTTP 直连）
+        http_client: 共享的 HTTP 客户端，为 None 时只使用浏览器
     """
+    if http_client is not None and not save_html:
+        article_data = await fetch_article_via_http(http_client, url)
+        if article_data:
+            print("  ✓ 已通过 HTTP 直连获取")
+            return article_data
+
     try:
         # 带重试的页面加载
-        if not goto_with_retry(page, url, wait_until="domcontentloaded", timeout=120000):
+        if not await goto_with_retry(page, url):
             return {
                 "url": url,
                 "error": "页面加载失败（多次重试后）",
                 "scraped_at": datetime.now().isoformat(),
             }
-        time.sleep(3)
+        # 等待正文段落出现（找不到时交给后面的备用选择器处理），
+        # 再等 HTML 解析完，避免正文只流式加载了一部分就开始提取
+        try:
+            await page.locator(f'{CONTENT_CONTAINER_SELECTOR} p').first.wait_for(state="attached", timeout=10000)
+            await page.wait_for_load_state("domcontentloaded", timeout=10000)
+        except PlaywrightTimeoutError:
+            print("  ⚠ 等待正文段落超时")
         
         # 保存HTML用于调试（放在最前面，确保能保存）
         if save_html:
             try:
-                html_content = page.content()
+                html_content = await page.content()
                 debug_file = ARTICLES_DIR / "debug_article.html"
-                with open(debug_file, "w", encoding="utf-8") as f:
-                    f.write(html_content)
+                await asyncio.to_thread(debug_file.write_text, html_content, encoding="utf-8")
                 print(f"  ✓ 文章HTML已保存到 {debug_file}")
             except Exception as e:
                 print(f"  ✗ 保存HTML失败: {e}")
@@ -441,107 +896,31 @@ def extract_article_content(page: Page, url: str, save_html: bool = False) -> di
             "scraped_at": datetime.now().isoformat(),
         }
         
-        # 提取标题
-        title_selectors = [
-            'h1',
-            'article h1',
-            '[data-testid="headline"]',
-            '.headline',
-            '.article-title',
-        ]
-        
-        for selector in title_selectors:
-            try:
-                title_el = page.locator(selector).first
-                if title_el.is_visible():
-                    article_data["title"] = title_el.inner_text().strip()
-                    break
-            except:
-                continue
-        
-        # 提取作者
-        author_selectors = [
-            '[data-testid="byline"]',
-            '.byline',
-            '.author',
-            'a[href*="/author/"]',
-        ]
-        
-        for selector in author_selectors:
-            try:
-                author_el = page.locator(selector).first
-                if author_el.is_visible():
-                    article_data["author"] = author_el.inner_text().strip()
-                    break
-            except:
-                continue
-        
-        # 提取发布日期
-        date_selectors = [
-            'time',
-            '[data-testid="timestamp"]',
-            '.publish-date',
-            '.date',
-        ]
-        
-        for selector in date_selectors:
-            try:
-                date_el = page.locator(selector).first
-                if date_el.is_visible():
-                    article_data["published_date"] = date_el.inner_text().strip()
-                    break
-            except:
-                continue
+        # 标题、作者、发布日期和正文段落一次取回
+        meta = await page.evaluate(META_JS, {
+            "title": TITLE_SELECTORS,
+            "author": AUTHOR_SELECTORS,
+            "date": DATE_SELECTORS,
+            "content": CONTENT_SELECTOR,
+            "container": CONTENT_CONTAINER_SELECTOR,
+            "skipClass": SKIP_CLASS_RE.pattern,
+        })
+        for field in ("title", "author", "published_date"):
+            if meta[field] is not None:
+                article_data[field] = meta[field]
         
         # 提取正文内容
         # The Athletic 的正文在 .article-content-container 里面的 <p> 标签
         # 需要排除：图片版权、广告、推荐内容等
-        paragraphs = []
+        # 段落在页面内已去除首尾空白并过滤掉过短的文本
+        paragraphs = meta["paragraphs"]
+        print(f"  找到 {len(paragraphs)} 个正文段落（使用选择器: {CONTENT_SELECTOR}）")
         
-        # 直接选择正文容器内的 p 标签，但排除特定类
-        # 正文 p 标签没有特殊 class，而图片版权等有特定 class
-        content_selector = 'div.article-content-container > p:not([class])'
-        p_elements = page.locator(content_selector).all()
-        
-        print(f"  找到 {len(p_elements)} 个正文段落（使用选择器: {content_selector}）")
-        
-        if p_elements:
-            for p in p_elements:
-                try:
-                    text = p.inner_text().strip()
-                    if text and len(text) > 10:
-                        paragraphs.append(text)
-                except:
-                    continue
-        
-        # 如果直接子元素没找到，尝试更宽松的选择器
-        if not paragraphs:
-            # 获取容器内所有 p，但排除 ignore 和 ad 内的
-            content_container = page.locator('div.article-content-container').first
-            if content_container.count() > 0:
-                all_p = content_container.locator('p').all()
-                print(f"  备用：找到 {len(all_p)} 个 p 标签")
-                
-                for p in all_p:
-                    try:
-                        # 获取 p 的 class 属性
-                        p_class = p.get_attribute('class') or ''
-                        
-                        # 排除有特定 class 的 p（图片版权、广告等）
-                        skip_classes = ['ImageCaption', 'ImageCredit', 'ad-slug', 'showcase']
-                        if any(skip in p_class for skip in skip_classes):
-                            continue
-                        
-                        text = p.inner_text().strip()
-                        
-                        # 过滤太短的段落和广告相关文本
-                        if text and len(text) > 20:
-                            # 排除常见的非正文内容
-                            skip_texts = ['advertisement', 'follow', 'twitter', '@', 'getty images', 'photo:']
-                            if not any(skip.lower() in text.lower()[:50] for skip in skip_texts):
-                                paragraphs.append(text)
-                    except:
-                        continue
+        # 如果直接子元素没找到，使用容器内所有 p（图片版权、广告等 class 已在页面内排除）
+        # 再过滤太短的段落和开头是常见非正文内容的段落
+        if not paragraphs and meta["fallback"]:
+            print(f"  备用：找到 {len(meta['fallback'])} 个 p 标签")
+            paragraphs = [t for t in meta["fallback"] if len(t) > 20 and not SKIP_TEXT_RE.search(t[:50])]
         
         article_data["content"] = "\n\n".join(paragraphs)
         article_data["paragraph_count"] = len(paragraphs)
@@ -556,6 +935,26 @@ def extract_article_content(page: Page, url: str, save_html: bool = False) -> di
         }
 
 
+class _SafeTitleTable(dict):
+    """
+    str.translate 用的文件名转换表：保留字母数字和下划线，空格替换为下划线，其余字符删除
+    ASCII 字符预先填好，其他字符首次出现时按 isalnum() 计算并缓存
+    """
+    
+    def __missing__(self, codepoint: int):
+        c = chr(codepoint)
+        value = c if c.isalnum() or c == "_" else "_" if c == " " else None
+        self[codepoint] = value
+        return value
+
+
+_SAFE_TITLE_TABLE = _SafeTitleTable()
+for _codepoint in range(128):
+    _SAFE_TITLE_TABLE[_codepoint]
+
+_UNDERSCORES_RE = re.compile(r'_+')
+
+
 def save_article(article: dict, output_dir: Path) -> Path:
     """
     保存文章到文件
@@ -566,14 +965,91 @@ def save_article(article: dict, output_dir: Path) -> Path:
     """
     # 创建安全的文件名：保留字母数字和下划线，空格替换为下划线
     title = article.get("title", "untitled")
-    safe_title = "".join(c if c.isalnum() or c == "_" else "_" if c == " " else "" for c in title)
+    safe_title = title.translate(_SAFE_TITLE_TABLE)
     # 合并连续的下划线，并限制长度
-    safe_title = "_".join(part for part in safe_title.split("_") if part)[:80]
+    safe_title = _UNDERSCORES_RE.sub("_", safe_title).strip("_")[:80]
     filename = f"{safe_title}.json"
     
     filepath = output_dir / filename
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(article, f, ensure_ascii=False, indent=2)
+    atomic_write(filepath, dump_json(article))
+    
+    return filepath
+
+
+async def _block_heavy_resources(route):
+    """按资源类型拦截请求，只放行文档、脚本和 XHR 等"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        # 交给先注册的路由（静态资源缓存）处理，未匹配时正常请求
+        await route.fallback()
+
+
+def _read_static_cache(body_path: Path, header_path: Path) -> tuple[bytes, dict] | None:
+    """读取缓存的响应体和响应头，未缓存时返回 None"""
+    try:
+        return body_path.read_bytes(), load_json(header_path.read_bytes())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_static_cache(body_path: Path, header_path: Path, body: bytes, headers: dict):
+    """先写响应体再写响应头，响应头存在即表示缓存完整"""
+    atomic_write(body_path, body)
+    atomic_write(header_path, dump_json_line(headers))
+
+
+async def _cache_static_route(route):
+    """静态资源磁盘缓存：命中直接返回缓存内容，未命中则请求并写入缓存（磁盘读写放到线程中）"""
+    key = hashlib.md5(route.request.url.encode()).hexdigest()
+    body_path = STATIC_CACHE_DIR / key
+    header_path = body_path.with_suffix(".hdr")
+    
+    cached = await asyncio.to_thread(_read_static_cache, body_path, header_path)
+    if cached is not None:
+        body, headers = cached
+        await route.fulfill(body=body, headers=headers)
+        return
+    
+    try:
+        resp = await route.fetch()
+    except Exception:
+        await route.abort()
+        return
+    
+    if resp.ok:
+        # route.fetch 返回的是解压后的内容，去掉编码相关的响应头
+        headers = {
+            k: v for k, v in resp.headers.items()
+            if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        }
+        await asyncio.to_thread(_write_static_cache, body_path, header_path, await resp.body(), headers)
+    
+    await route.fulfill(response=resp)
+
+
+async def _abort_route(route):
+    await route.abort()
+
+
+_index_lock = threading.Lock()
+
+
+def persist_article(article: dict, url: str, digest: int | None) -> Path | None:
+    """
+    按发布日期保存文章并追加索引和指纹记录（在后台写盘线程中执行）
+    内容重复的文章（带 duplicate_of）不保存，只记入索引避免下次重复抓取
+    """
+    filepath = None
+    if "duplicate_of" not in article:
+        output_dir = get_output_dir_by_date(article.get("published_date", ""))
+        filepath = save_article(article, output_dir)
+    
+    # 索引立即追加到文件，中途崩溃也不会丢失已抓取记录
+    with _index_lock:
+        append_index_entry(url, datetime.now().isoformat())
+        if filepath is not None and digest is not None:
+            append_digest(url, digest)
     
     return filepath
 
@@ -583,12 +1059,18 @@ def is_ci_environment() -> bool:
     return os.environ.get("CI") == "true" or os.environ.get("GITHUB_ACTIONS") == "true"
 
 
-def launch_browser(p, with_cookie: bool = False):
+async def launch_browser(p, with_cookie: bool = False):
     """
     启动浏览器，可选择性地加载已保存的 Cookie
     在 CI 环境中自动使用 headless 模式
+    
+    加载 Cookie 时使用持久化上下文（PROFILE_DIR），跨运行只保留 Cookie 和 localStorage
+    （context.route 拦截请求时 Playwright 禁用 HTTP 缓存，静态资源由 STATIC_CACHE_DIR 缓存）；
+    每次启动都会用 auth_state.json 的 Cookie 覆盖用户目录中的同名 Cookie，以该文件为准
+    此时上下文自己管理浏览器进程，返回的 browser 为 None，关闭 context 即可
     """
     browser = None
+    context = None
     is_ci = is_ci_environment()
     headless = is_ci  # CI 环境使用 headless 模式
     
@@ -602,13 +1084,29 @@ def launch_browser(p, with_cookie: bool = False):
         (p.chromium, "Chromium")
     ]
     
+    # 指定的或上次成功的浏览器放到最前面，启动失败时再按默认顺序尝试其余浏览器
+    cached = CHOSEN_BROWSER_FILE.read_text().strip() if CHOSEN_BROWSER_FILE.exists() else ""
+    preferred = os.environ.get("SCRAPER_BROWSER", "").strip().lower() or cached
+    browser_types = {"chromium": (p.chromium, "Chromium"), "firefox": (p.firefox, "Firefox"), "webkit": (p.webkit, "WebKit")}
+    if preferred in browser_types:
+        browser_order = [browser_types[preferred]] + [b for b in browser_order if b[1].lower() != preferred]
+    
+    context_options = {
+        "viewport": {"width": 1920, "height": 1080},
+        "user_agent": USER_AGENT,
+    }
+    
     # 尝试启动浏览器
     for browser_type, name in browser_order:
         try:
             print(f"尝试启动 {name} 浏览器...", flush=True)
+            launch_options = {
+                "headless": headless,
+                "slow_mo": 0 if is_ci else 100,
+            }
             if name == "Chromium":
                 # CI 环境需要更多参数来确保稳定性
-                chromium_args = [
+                launch_options["args"] = [
                     '--disable-gpu',
                     '--no-sandbox',
                     '--disable-dev-shm-usage',
@@ -622,39 +1120,71 @@ def launch_browser(p, with_cookie: bool = False):
                     '--no-first-run',
                     '--safebrowsing-disable-auto-update',
                 ]
-                browser = browser_type.launch(
-                    headless=headless,
-                    slow_mo=0 if is_ci else 100,
-                    args=chromium_args
+            if with_cookie:
+                # 不同浏览器的用户目录互不兼容，各用一个子目录
+                context = await browser_type.launch_persistent_context(
+                    str(PROFILE_DIR / name.lower()), **launch_options, **context_options
                 )
             else:
-                browser = browser_type.launch(headless=headless, slow_mo=0 if is_ci else 100)
+                browser = await browser_type.launch(**launch_options)
             print(f"✓ {name} 启动成功", flush=True)
+            if name.lower() != cached:
+                CHOSEN_BROWSER_FILE.write_text(name.lower())
             break
         except Exception as e:
             print(f"{name} 启动失败: {e}", flush=True)
     
-    if browser is None:
+    if browser is None and context is None:
         print("所有浏览器都无法启动，请运行: playwright install chromium")
         return None, None
     
-    # 创建上下文，可选择性地加载 Cookie
-    context_options = {
-        "viewport": {"width": 1920, "height": 1080},
-        "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-    }
+    if with_cookie:
+        # 持久化上下文不支持 storage_state 参数，手动加载保存的 Cookie 和 localStorage
+        if COOKIE_FILE.exists():
+            state = load_json(COOKIE_FILE.read_bytes())
+            await context.add_cookies(state.get("cookies", []))
+            origins = state.get("origins", [])
+            if origins:
+                await context.add_init_script(LOCAL_STORAGE_JS % json.dumps(origins))
+            print(f"✓ 已加载 Cookie: {COOKIE_FILE}（localStorage 来源 {len(origins)} 个）")
+    else:
+        context = await browser.new_context(**context_options)
     
-    if with_cookie and COOKIE_FILE.exists():
-        context_options["storage_state"] = str(COOKIE_FILE)
-        print(f"✓ 已加载 Cookie: {COOKIE_FILE}")
+    # 拦截不需要的资源（后注册的路由优先匹配，统计脚本直接中断）
+    STATIC_CACHE_DIR.mkdir(exist_ok=True)
+    await context.route(STATIC_CACHE_PATTERN, _cache_static_route)
+    await context.route("**/*", _block_heavy_resources)
+    for pattern in BLOCKED_URL_PATTERNS:
+        await context.route(pattern, _abort_route)
     
-    context = browser.new_context(**context_options)
     return browser, context
 
 
-def main():
+async def make_pages(context: BrowserContext, k: int) -> asyncio.Queue:
+    """
+    在同一个已登录的上下文中打开 k 个页面，组成文章提取用的页面池
+    页面共享 Cookie 和路由规则，开销远小于新建上下文或浏览器
+    """
+    pages = asyncio.Queue()
+    for page in await asyncio.gather(*(context.new_page() for _ in range(k))):
+        pages.put_nowait(page)
+    return pages
+
+
+def parse_concurrency(argv: list[str]) -> int:
+    """解析 --concurrency N 参数，缺省或非法时使用 MAX_CONCURRENCY"""
+    if "--concurrency" in argv:
+        idx = argv.index("--concurrency")
+        try:
+            return max(1, int(argv[idx + 1]))
+        except (IndexError, ValueError):
+            print(f"⚠️  --concurrency 参数无效，使用默认值 {MAX_CONCURRENCY}")
+    return MAX_CONCURRENCY
+
+
+async def main_async():
     """
-    主函数
+    主函数（异步）
     
     使用方法:
       python scraper.py --login   # 手动登录并保存 Cookie
@@ -666,6 +1196,7 @@ def main():
     login_mode = "--login" in sys.argv
     debug_mode = "--debug" in sys.argv  # 调试模式：只抓取第一篇文章
     save_html = "--save-html" in sys.argv  # 保存HTML文件用于调试
+    concurrency = parse_concurrency(sys.argv)  # 同时提取的文章页面数
     
     is_ci = is_ci_environment()
     print(f"[DEBUG] CI 环境: {is_ci}", flush=True)
@@ -676,12 +1207,12 @@ def main():
     print("=" * 60)
     
     print("[DEBUG] 准备启动 Playwright...", flush=True)
-    with sync_playwright() as p:
+    async with async_playwright() as p:
         print("[DEBUG] Playwright 启动成功", flush=True)
         
         # 登录模式：手动登录并保存 Cookie
         if login_mode:
-            manual_login_and_save_cookie(p)
+            await manual_login_and_save_cookie(p)
             return
         
         # 爬取模式：检查是否有 Cookie
@@ -694,56 +1225,39 @@ def main():
             return
         
         # 启动浏览器并加载 Cookie
-        browser, context = launch_browser(p, with_cookie=True)
-        if browser is None:
+        browser, context = await launch_browser(p, with_cookie=True)
+        if context is None:
             return
         
-        page = context.new_page()
+        page = await context.new_page()
+        http_client = None
+        writer = ThreadPoolExecutor(max_workers=WRITER_THREADS)
         
         try:
             # 验证登录状态
-            print("🔍 验证登录状态...", flush=True)
-            page.goto("https://www.nytimes.com/athletic/", wait_until="domcontentloaded", timeout=60000)
-            time.sleep(2)
-            
-            # 检查是否有登录按钮（未登录状态）或用户菜单（已登录状态）
-            login_button = page.locator('a[href*="/login"], button:has-text("Log In"), a:has-text("Log In")')
-            subscribe_button = page.locator('a[href*="/subscribe"], button:has-text("Subscribe")')
+            await verify_login(page, context)
             
-            # 检查页面上的登录/订阅按钮
-            has_login = login_button.count() > 0
-            has_subscribe = subscribe_button.count() > 0
-            
-            # 打印当前页面的 cookies
-            cookies = context.cookies()
-            athletic_cookies = [c for c in cookies if 'athletic' in c.get('domain', '') or 'nytimes' in c.get('domain', '')]
-            print(f"  当前会话 cookies 数量: {len(cookies)} (athletic/nytimes相关: {len(athletic_cookies)})", flush=True)
-            
-            if has_login or has_subscribe:
-                print("⚠️  警告: 检测到登录/订阅按钮，可能未成功登录！", flush=True)
-                print("  请检查 AUTH_STATE_JSON secret 是否正确设置", flush=True)
-            else:
-                print("✓ 登录状态验证通过", flush=True)
+            # 用已登录会话的 Cookie 构建 HTTP 客户端，文章优先走 HTTP 直连
+            http_client = await build_http_client(context)
             
             # 加载文章索引（用于去重）
-            index = load_index()
-            print(f"✓ 已加载索引，历史抓取文章数: {len(index)}")
+            # 启动时压缩一次索引文件，之后抓取过程中只需要判断 URL 是否已存在
+            index = await asyncio.to_thread(load_index)
+            await asyncio.to_thread(save_index, index)
+            seen = set(index)
+            print(f"✓ 已加载索引，历史抓取文章数: {len(seen)}")
+            digests = await asyncio.to_thread(load_digests)
             
             # 获取文章链接
-            articles = get_article_links(page, debug=save_html)
+            articles = await get_article_links(page, debug=save_html)
             
             if not articles:
                 print("未找到任何文章链接")
                 return
             
             # 过滤已抓取的文章
-            new_articles = []
-            skipped_count = 0
-            for article in articles:
-                if is_article_scraped(index, article["url"]):
-                    skipped_count += 1
-                else:
-                    new_articles.append(article)
+            new_articles = [article for article in articles if article["url"] not in seen]
+            skipped_count = len(articles) - len(new_articles)
             
             print(f"✓ 找到 {len(articles)} 篇文章，其中 {skipped_count} 篇已抓取，{len(new_articles)} 篇待抓取")
             
@@ -760,40 +1274,77 @@ def main():
                 print("🔧 调试模式：只抓取第一篇文章")
                 new_articles = new_articles[:1]
             
-            all_articles = []
-            success_count = 0
+            # 同一个上下文中的 concurrency 个页面组成页面池并发提取，
+            # 每个页面处理完一篇文章后放回池中复用，池的大小即并发上限
+            total = len(new_articles)
+            save_tasks = []
             
-            for i, article_info in enumerate(new_articles, 1):
-                print(f"[{i}/{len(new_articles)}] 正在提取: {article_info['title'][:50]}...")
-                
-                # 只在指定 --save-html 参数且是第一篇文章时保存HTML
-                should_save_html = save_html and (i == 1)
-                article_data = extract_article_content(page, article_info["url"], save_html=should_save_html)
-                all_articles.append(article_data)
-                
+            async def _save(i: int, article_info: dict, article_data: dict, digest: int | None):
+                filepath = await asyncio.wrap_future(writer.submit(persist_article, article_data, article_info["url"], digest))
+                if filepath is None:
+                    print(f"  ⊘ [{i}/{total}] 内容与已抓取文章重复，跳过保存: {article_data['duplicate_of']}")
+                    return
                 content_len = len(article_data.get("content", ""))
-                if "error" in article_data:
-                    print(f"  ✗ 提取失败: {article_data['error']}")
-                else:
-                    # 根据发布日期确定存储目录
-                    published_date = article_data.get("published_date", "")
-                    output_dir = get_output_dir_by_date(published_date)
-                    
-                    # 保存单篇文章
-                    filepath = save_article(article_data, output_dir)
+                print(f"  ✓ [{i}/{total}] 已保存: {filepath.parent.name}/{filepath.name} ({content_len} 字符)")
+            
+            async def _extract(pages: asyncio.Queue, i: int, article_info: dict) -> bool:
+                article_page = await pages.get()
+                try:
+                    print(f"[{i}/{total}] 正在提取: {article_info['title'][:50]}...")
                     
-                    print(f"  ✓ 已保存: {output_dir.name}/{filepath.name} ({content_len} 字符)")
-                    success_count += 1
+                    # 只在指定 --save-html 参数且是第一篇文章时保存HTML
+                    should_save_html = save_html and (i == 1)
+                    article_data = await extract_article_content(
+                        article_page, article_info["url"], save_html=should_save_html, http_client=http_client
+                    )
                     
-                    # 更新索引
-                    index[article_info["url"]] = datetime.now().isoformat()
+                    # 添加延迟，避免请求过快
+                    await asyncio.sleep(2)
+                finally:
+                    pages.put_nowait(article_page)
+                
+                if "error" in article_data:
+                    print(f"  ✗ [{i}/{total}] 提取失败: {article_data['error']}")
+                    return False
+                
+                # 正文指纹与已保存的文章比对，识别换了 ID 重新发布的重复内容
+                digest = simhash(article_data.get("content") or "")
+                if digest is not None:
+                    duplicate_of = find_near_duplicate(digest, digests)
+                    if duplicate_of:
+                        article_data["duplicate_of"] = duplicate_of
+                    else:
+                        digests[article_info["url"]] = digest
                 
-                # 添加延迟，避免请求过快
-                time.sleep(2)
+                # 交给后台线程写盘，当前页面立即开始下一篇
+                seen.add(article_info["url"])
+                save_tasks.append(asyncio.create_task(_save(i, article_info, article_data, digest)))
+                return True
             
-            # 保存索引
-            save_index(index)
-            print(f"✓ 索引已更新，当前总文章数: {len(index)}")
+            success_count = 0
+            for start in range(0, total, CONTEXT_RECYCLE_EVERY):
+                if start > 0:
+                    # 关闭旧上下文释放内存，重新启动并验证登录（Cookie 由持久化目录和 auth_state.json 恢复）
+                    print(f"♻️  已处理 {start} 篇，重建浏览器上下文...", flush=True)
+                    await context.close()
+                    browser, context = await launch_browser(p, with_cookie=True)
+                    if context is None:
+                        break
+                    page = await context.new_page()
+                    await verify_login(page, context)
+                
+                pages = await make_pages(context, concurrency)
+                
+                batch = list(enumerate(new_articles, 1))[start:start + CONTEXT_RECYCLE_EVERY]
+                results = await asyncio.gather(
+                    *(_extract(pages, i, article_info) for i, article_info in batch)
+                )
+                success_count += sum(results)
+            
+            # 等待所有文章写盘完成
+            await asyncio.gather(*save_tasks)
+            
+            print(f"✓ 索引已更新，当前总文章数: {len(seen)}")
             
             print("\n" + "=" * 60)
             print(f"✓ 爬取完成!")
@@ -805,7 +1356,16 @@ def main():
             print("=" * 60)
             
         finally:
-            browser.close()
+            writer.shutdown(wait=True)
+            if http_client is not None:
+                await http_client.aclose()
+            if context is not None:
+                await context.close()
+
+
+def main():
+    """同步入口，保持 `python scraper.py` 和 `from scraper import main` 的用法不变"""
+    asyncio.run(main_async())
 
 
 if __name__ == "__main__":
@@ -3,19 +3,18 @@
 
 功能：
 1. 读取 summary 目录下昨天的 summary 文件，例如 20260205_summary.txt
-2. 将文件完整内容通过 webhook 发送给飞书机器人
+2. 将文件完整内容通过 webhook 发送给飞书机器人（超过单条消息长度限制时按段落拆分为多条）
 3. webhook 地址通过环境变量配置
 """
 
+import asyncio
+import json
 import os
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
-import json
-import urllib.request
-import urllib.error
-import ssl
+import httpx
 from dotenv import load_dotenv
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
 
 BASE_DIR = Path(__file__).resolve().parent
@@ -27,6 +26,15 @@ load_dotenv(dotenv_path=BASE_DIR / ".env")
 # 飞书机器人 Webhook 环境变量名
 FEISHU_WEBHOOK_ENV = "FEISHU_WEBHOOK_URL"
 
+# 发送失败重试次数，重试间隔 5s、10s ... 指数增长（封顶 30s）
+MAX_RETRIES = 3
+
+# 飞书单条文本消息约 30KB 上限，留出余量和 [i/N] 序号的空间
+MAX_MESSAGE_BYTES = 28_000
+
+# 多条消息同时发送的上限，避免触发机器人限流
+SEND_CONCURRENCY = 3
+
 
 def get_yesterday_date_str() -> str:
     """获取昨天的日期字符串，格式 YYYYMMDD"""
@@ -57,9 +65,52 @@ def load_yesterday_summary() -> tuple[Path, str]:
     return file_path, content
 
 
-def send_to_feishu(webhook_url: str, content: str, verify_ssl: bool = True) -> str:
+def _utf8_len(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def split_by_paragraphs(content: str, max_bytes: int = MAX_MESSAGE_BYTES) -> list[str]:
+    """
+    按段落（空行）把内容拆成若干条，每条的 UTF-8 长度不超过 max_bytes
+    单个段落本身超长时按字符硬切
+    """
+    chunks = []
+    current = ""
+    for paragraph in content.split("\n\n"):
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if _utf8_len(candidate) <= max_bytes:
+            current = candidate
+            continue
+
+        if current:
+            chunks.append(current)
+        current = paragraph
+        while _utf8_len(current) > max_bytes:
+            # 找到不超过 max_bytes 的最长前缀（按字节截断后丢掉被截断的半个字符）
+            head = current.encode("utf-8")[:max_bytes].decode("utf-8", errors="ignore")
+            chunks.append(head)
+            current = current[len(head):]
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _log_retry(retry_state) -> None:
+    print(f"发送失败: {retry_state.outcome.exception()}")
+    print(f"{retry_state.next_action.sleep:.0f} 秒后重试...")
+
+
+@retry(
+    stop=stop_after_attempt(MAX_RETRIES),
+    wait=wait_exponential(multiplier=5, max=30),
+    retry=retry_if_exception_type(httpx.HTTPError),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+async def send_to_feishu(client: httpx.AsyncClient, webhook_url: str, content: str) -> str:
     """
-    将内容发送到飞书机器人
+    将内容发送到飞书机器人，失败时自动重试（重试复用同一个连接池）
 
     按用户要求，HTTP body 结构为：
     {
@@ -72,7 +123,7 @@ def send_to_feishu(webhook_url: str, content: str, verify_ssl: bool = True) -> s
     Returns:
         飞书返回的响应文本
     Raises:
-        urllib.error.URLError: 网络或 HTTP 错误
+        httpx.HTTPError: 重试 MAX_RETRIES 次后仍然出现的网络或 HTTP 错误
     """
     body = {
         "msg_type": "text",
@@ -81,30 +132,61 @@ def send_to_feishu(webhook_url: str, content: str, verify_ssl: bool = True) -> s
         },
     }
 
+    # 中文不转义为 \uXXXX，请求体字节数与按 UTF-8 拆分时的估算一致
+    # （httpx 的 json= 参数在 0.28 之前会转义非 ASCII 字符，中文体积翻倍）
     data = json.dumps(body, ensure_ascii=False).encode("utf-8")
-
-    req = urllib.request.Request(
+    resp = await client.post(
         webhook_url,
-        data=data,
+        content=data,
         headers={"Content-Type": "application/json; charset=utf-8"},
-        method="POST",
     )
+    resp.raise_for_status()
+    return resp.text
 
-    # SSL 配置：默认校验证书，如需调试可关闭验证
-    if verify_ssl:
-        ssl_context = ssl.create_default_context()
-    else:
-        ssl_context = ssl._create_unverified_context()
 
-    # 显式关闭系统环境中的 HTTP/HTTPS 代理，避免公司代理导致 SSL 异常
-    proxy_handler = urllib.request.ProxyHandler({})
-    https_handler = urllib.request.HTTPSHandler(context=ssl_context)
-    opener = urllib.request.build_opener(proxy_handler, https_handler)
+async def send_summary(webhook_url: str, content: str, verify_ssl: bool = True) -> list[str]:
+    """
+    发送整份 summary；内容过长时拆成多条并发发送，每条开头带 [i/N] 序号方便按顺序阅读
 
-    # 直接请求飞书，不经过任何代理
-    with opener.open(req) as resp:
-        resp_text = resp.read().decode("utf-8", errors="replace")
-        return resp_text
+    Returns:
+        每条消息飞书返回的响应文本
+    Raises:
+        RuntimeError: 有消息重试 MAX_RETRIES 次后仍然发送失败，错误信息中列出失败和已送达的序号
+    """
+    chunks = split_by_paragraphs(content)
+    total = len(chunks)
+    if total > 1:
+        print(f"内容超过单条消息上限，拆分为 {total} 条发送")
+        chunks = [f"[{i}/{total}]\n{chunk}" for i, chunk in enumerate(chunks, 1)]
+
+    semaphore = asyncio.Semaphore(SEND_CONCURRENCY)
+
+    async def _send(i: int, chunk: str) -> str:
+        async with semaphore:
+            print(f"正在发送第 {i}/{total} 条消息...")
+            return await send_to_feishu(client, webhook_url, chunk)
+
+    # 显式关闭系统环境中的 HTTP/HTTPS 代理（trust_env=False），避免公司代理导致 SSL 异常
+    # SSL 默认校验证书，如需调试可关闭验证
+    # 某条失败时等其他消息发送完再关闭连接池，最后统一报告失败的序号
+    async with httpx.AsyncClient(http2=True, trust_env=False, timeout=15, verify=verify_ssl) as client:
+        results = await asyncio.gather(
+            *(_send(i, chunk) for i, chunk in enumerate(chunks, 1)),
+            return_exceptions=True,
+        )
+
+    failed = [(i, result) for i, result in enumerate(results, 1) if isinstance(result, BaseException)]
+    for _, error in failed:
+        if not isinstance(error, httpx.HTTPError):
+            raise error
+    if failed:
+        sent = [str(i) for i, result in enumerate(results, 1) if not isinstance(result, BaseException)]
+        details = "; ".join(f"[{i}/{total}] {error}" for i, error in failed)
+        raise RuntimeError(
+            f"发送到飞书失败（重试 {MAX_RETRIES} 次后）: 第 {'、'.join(str(i) for i, _ in failed)} 条未送达，"
+            f"已送达: {'、'.join(sent) or '无'}。{details}"
+        )
+    return results
 
 
 def main() -> None:
@@ -127,35 +209,13 @@ def main() -> None:
 
     print(f"准备发送 summary 文件: {summary_path}")
 
-    # 发送到飞书，失败重试
-    max_retries = 3
-    delay_seconds = 10
-    last_error = None
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            print(f"第 {attempt}/{max_retries} 次尝试发送到飞书...")
-            resp_text = send_to_feishu(
-                webhook_url,
-                summary_content,
-                verify_ssl=not insecure_ssl,
-            )
-        except urllib.error.URLError as e:
-            last_error = e
-            print(f"发送失败: {e}")
-            if attempt < max_retries:
-                print(f"{delay_seconds} 秒后重试...")
-                time.sleep(delay_seconds)
-            continue
-        else:
-            print("发送成功，飞书返回：")
-            print(resp_text)
-            break
-    else:
-        # 所有重试都失败
-        raise RuntimeError(f"发送到飞书失败（重试 {max_retries} 次后）: {last_error}")
+    # 发送到飞书，失败重试；所有重试都失败时抛出 RuntimeError
+    resp_texts = asyncio.run(send_summary(webhook_url, summary_content, verify_ssl=not insecure_ssl))
+
+    print("发送成功，飞书返回：")
+    for resp_text in resp_texts:
+        print(resp_text)
 
 
 if __name__ == "__main__":
     main()
-
@@ -6,16 +6,36 @@
 import os
 import sys
 import json
-import time
+import asyncio
 import argparse
+import functools
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from openai import OpenAI
+import httpx
+from aiolimiter import AsyncLimiter
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from dotenv import load_dotenv
 
+# JSON 解析：优先使用 orjson，未安装时回退到标准库 json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 加载环境变量
 load_dotenv()
 
+# 生成摘要期间的进度输出（见 start_progress_log）
+log = logging.getLogger("summary")
+
 # 配置
 ARTICLES_DIR = Path("articles")
 SUMMARY_DIR = Path("summary")
@@ -23,14 +43,39 @@ SUMMARY_DIR.mkdir(exist_ok=True)
 
 PROMPT_FILE = Path("prompt.txt")
 
+# 摘要缓存：相同模型、提示词和文章内容直接复用之前的结果，不再调用 API
+CACHE_DB = SUMMARY_DIR / ".cache" / "summaries.sqlite3"
+
 # DeepSeek API 配置
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
+MODEL = "deepseek-chat"
 
 # API 调用配置
 API_TIMEOUT = 120  # 超时时间（秒）
-MAX_RETRIES = 3    # 最大重试次数
-RETRY_DELAY = 5    # 重试间隔（秒）
+MAX_RETRIES = 5    # 最大尝试次数（指数退避 1s、2s、4s ... 封顶 30s，带随机抖动）
+# 可以重试的错误：超时和网络错误（APITimeoutError 是 APIConnectionError 的子类）、429 限流、5xx
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+MAX_CONCURRENCY = 16  # 同时进行的 API 请求数上限（避免触发 DeepSeek 限流）
+DEFAULT_RPM = 60  # 每分钟请求数上限（令牌桶平滑请求），可用 --rpm 覆盖，0 表示不限制
+DEFAULT_BATCH_SIZE = 4  # 每次请求打包的文章数，可用 --batch-size 覆盖
+MAX_SUMMARY_TOKENS = 1024  # 单篇摘要的输出上限（实际摘要一般在 300 token 以内，留足余量）
+MAX_BATCH_OUTPUT_TOKENS = 8192  # 批量请求的输出上限（deepseek-chat 的最大值）
+MAX_INPUT_TOKENS = 8000  # 单篇文章正文的 token 预算，超出部分截断后再发送
+
+# 估算 token 数时统计中文字符：U+4000–U+9FFF（覆盖 CJK 统一汉字基本区）的字符在 UTF-8 中
+# 以 0xE4–0xE9 开头，且这几个字节不会作为后续字节出现，删掉其余字节后剩下的长度就是字符数
+NON_CJK_LEAD_BYTES = bytes(b for b in range(256) if not 0xE4 <= b <= 0xE9)
+
+EMPTY_CONTENT_SUMMARY = "（文章内容为空，无法生成摘要）"
+FAILED_SUMMARY = "（摘要生成失败）"
+
+# 批量请求时附加在提示词后面的说明（JSON 模式要求提示词中出现 json 字样）
+# 内容固定不变，和提示词一起作为 system 消息，便于命中 DeepSeek 的前缀缓存
+BATCH_INSTRUCTION = (
+    "用户会发送多篇文章，每篇以“### Article 编号”开头，请按上述要求分别为每篇文章生成摘要。"
+    "只返回 JSON，格式为：{\"summaries\": [{\"id\": 文章编号, \"summary\": \"摘要内容\"}]}"
+)
 
 
 def get_yesterday_date() -> str:
@@ -49,34 +94,95 @@ def load_prompt() -> str:
         return "请为以下文章生成一个简洁的中文摘要，不超过200字："
 
 
+def _load_article(file_path: Path) -> dict | None:
+    """读取单篇文章，失败时返回 None"""
+    try:
+        data = file_path.read_bytes()
+        article = orjson.loads(data) if orjson is not None else json.loads(data)
+        article["_file_path"] = str(file_path)
+        return article
+    except Exception as e:
+        print(f"读取文件失败 {file_path}: {e}")
+        return None
+
+
 def load_articles(date_str: str) -> list[dict]:
-    """加载指定日期的所有文章"""
+    """加载指定日期的所有文章（多线程并行读取文件）"""
     articles_path = ARTICLES_DIR / date_str
     
     if not articles_path.exists():
         print(f"目录不存在: {articles_path}")
         return []
     
-    articles = []
-    for file_path in articles_path.glob("*.json"):
-        # 跳过 article_links.json 等非文章文件
-        if file_path.name.startswith("article_links") or file_path.name.startswith("all_articles"):
-            continue
-        
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                article = json.load(f)
-                article["_file_path"] = str(file_path)
-                articles.append(article)
-        except Exception as e:
-            print(f"读取文件失败 {file_path}: {e}")
+    # 跳过 article_links.json 等非文章文件
+    paths = [
+        file_path for file_path in articles_path.glob("*.json")
+        if not file_path.name.startswith(("article_links", "all_articles"))
+    ]
     
-    return articles
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        return [article for article in executor.map(_load_article, paths) if article is not None]
+
+
+@functools.lru_cache(maxsize=1)
+def _cache_db() -> sqlite3.Connection:
+    """打开（必要时创建）摘要缓存数据库"""
+    CACHE_DB.parent.mkdir(exist_ok=True)
+    # 写入在线程池中进行，连接需要跨线程使用
+    conn = sqlite3.connect(CACHE_DB, check_same_thread=False)
+    conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, summary TEXT, tokens INT)")
+    return conn
+
+
+def cache_key(prompt: str, title: str, content: str) -> str:
+    """缓存键包含模型名，更换模型后自然失效"""
+    return hashlib.sha256(f"{MODEL}|{prompt}|{title}|{content}".encode("utf-8")).hexdigest()
+
+
+def cache_get(key: str) -> tuple[str, int] | None:
+    """查询缓存，返回 (摘要, 当时消耗的 token 数)，未命中返回 None"""
+    return _cache_db().execute("SELECT summary, tokens FROM cache WHERE key = ?", (key,)).fetchone()
+
+
+_cache_lock = threading.Lock()
+
+
+def _cache_write(key: str, summary: str, tokens: int):
+    with _cache_lock, _cache_db() as conn:
+        conn.execute("INSERT OR REPLACE INTO cache (key, summary, tokens) VALUES (?, ?, ?)", (key, summary, tokens))
+
+
+async def cache_set(key: str, summary: str, tokens: int):
+    """
+    写入缓存（每篇摘要生成后立即落盘，中途失败重跑时已完成的文章直接命中缓存）
+    提交事务的磁盘写入放到线程中进行，不阻塞其他请求
+    """
+    await asyncio.to_thread(_cache_write, key, summary, tokens)
+
+
+def start_progress_log() -> QueueListener:
+    """
+    并发生成摘要期间的进度输出先放入队列，由后台线程写到 stdout，
+    终端或管道写入缓慢时不会阻塞事件循环；调用方结束后需要 stop() 以输出剩余内容
+    """
+    log_queue = queue.SimpleQueue()
+    log.handlers.clear()
+    log.addHandler(QueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
 
 
 class SummaryGenerationError(Exception):
-    """摘要生成失败异常"""
-    pass
+    """摘要生成失败异常，tokens 为失败前已经消耗的 token 数"""
+    
+    def __init__(self, message: str, tokens: int = 0):
+        super().__init__(message)
+        self.tokens = tokens
 
 
 def estimate_tokens(text: str) -> int:
@@ -84,14 +190,98 @@ def estimate_tokens(text: str) -> int:
     粗略估算文本的 token 数
     中文约 1.5 字符 = 1 token，英文约 4 字符 = 1 token
     """
-    chinese_chars = sum(1 for c in text if '\u4e00' <= c <= '\u9fff')
+    chinese_chars = len(text.encode("utf-8").translate(None, NON_CJK_LEAD_BYTES))
     other_chars = len(text) - chinese_chars
     return int(chinese_chars / 1.5 + other_chars / 4)
 
 
-def generate_summary(client: OpenAI, prompt: str, article: dict) -> tuple[str, int]:
+def truncate_content(content: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
+    """
+    正文预估 token 数超过预算时按比例截断，尽量在段落边界处截断
+    """
+    tokens = estimate_tokens(content)
+    if tokens <= max_tokens:
+        return content
+    
+    # 按本文实际的字符/token 比例换算截断长度
+    max_chars = len(content) * max_tokens // tokens
+    truncated = content[:max_chars]
+    cut = truncated.rfind("\n")
+    if cut > max_chars // 2:
+        truncated = truncated[:cut]
+    log.info(f"  ✂ 正文约 {tokens:,} tokens，超出预算，截断为 {len(truncated):,} 字符")
+    return truncated
+
+
+def _log_retry(retry_state) -> None:
+    error = retry_state.outcome.exception()
+    log.warning(f"  ⚠ API 请求失败（{type(error).__name__}），第 {retry_state.attempt_number}/{MAX_RETRIES} 次重试...")
+
+
+@retry(
+    stop=stop_after_attempt(MAX_RETRIES),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    retry=retry_if_exception_type(RETRYABLE_ERRORS),
+    before_sleep=_log_retry,
+    reraise=True,
+)
+async def _chat(client: AsyncOpenAI, messages: list[dict], limiter: AsyncLimiter | None, **kwargs):
+    # 每次尝试（包括重试）都先从令牌桶取得配额
+    if limiter is not None:
+        await limiter.acquire()
+    return await client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=0.2,
+        timeout=API_TIMEOUT,
+        **kwargs,
+    )
+
+
+async def create_completion(client: AsyncOpenAI, system_message: str, user_message: str,
+                            limiter: AsyncLimiter | None = None, **kwargs):
+    """
+    调用 DeepSeek 对话接口，超时、网络错误、限流和服务端错误时按指数退避重试
+    固定的提示词放在 system 消息中、文章内容放在 user 消息中，
+    相同的前缀可以命中 DeepSeek 的上下文缓存（命中部分按缓存价格计费）
+    
+    Raises:
+        SummaryGenerationError: 重试多次后仍然失败，或出现其他错误
+    """
+    messages = [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_message},
+    ]
+    
+    try:
+        response = await _chat(client, messages, limiter, **kwargs)
+    except RETRYABLE_ERRORS as e:
+        # 重试次数用完仍然失败
+        raise SummaryGenerationError(f"生成摘要失败（重试 {MAX_RETRIES} 次后）: {e}")
+    except Exception as e:
+        # 其他错误直接抛出
+        raise SummaryGenerationError(f"生成摘要失败: {e}")
+    
+    # DeepSeek 在 usage 中返回提示词缓存命中的 token 数
+    usage = getattr(response, 'usage', None)
+    cache_hit = getattr(usage, 'prompt_cache_hit_tokens', None)
+    if cache_hit is not None:
+        log.info(f"  · 提示词缓存命中 {cache_hit}/{usage.prompt_tokens} tokens")
+    
+    return response
+
+
+def usage_tokens(response, messages: tuple[str, ...], output: str) -> int:
+    """从响应获取实际 token 数，否则粗略估算：输入 + 输出"""
+    if hasattr(response, 'usage') and response.usage:
+        return response.usage.total_tokens
+    return sum(estimate_tokens(message) for message in messages) + estimate_tokens(output)
+
+
+async def generate_summary(client: AsyncOpenAI, prompt: str, article: dict,
+                           limiter: AsyncLimiter | None = None) -> tuple[str, int]:
     """
-    调用 DeepSeek API 生成摘要，带重试机制
+    调用 DeepSeek API 为单篇文章生成摘要，带重试机制
     
     Returns:
         tuple: (摘要文本, 预估token数)
@@ -103,56 +293,121 @@ def generate_summary(client: OpenAI, prompt: str, article: dict) -> tuple[str, i
     content = article.get("content", "")
     
     if not content:
-        return "（文章内容为空，无法生成摘要）", 0
+        return EMPTY_CONTENT_SUMMARY, 0
+    
+    # 命中缓存时不消耗 token
+    key = cache_key(prompt, title, content)
+    cached = cache_get(key)
+    if cached is not None:
+        log.info(f"  ✓ 命中摘要缓存: {title[:50]}")
+        return cached[0], 0
     
     # 构建消息
-    user_message = f"{prompt}\n\n标题：{title}\n\n正文：\n{content}"
+    user_message = f"标题：{title}\n\n正文：\n{truncate_content(content)}"
+    
+    response = await create_completion(client, prompt, user_message, limiter=limiter, max_tokens=MAX_SUMMARY_TOKENS)
+    try:
+        choice = response.choices[0] if response.choices else None
+        summary = ((choice.message.content if choice else None) or "").strip()
+        total_tokens = usage_tokens(response, (prompt, user_message), summary)
+    except Exception as e:
+        raise SummaryGenerationError(f"生成摘要失败（响应无法解析）: {e}")
+    if not summary:
+        # 空摘要不写入缓存，作为失败处理，下次运行时重新生成
+        raise SummaryGenerationError("生成摘要失败: 模型返回了空摘要", tokens=total_tokens)
+    if choice.finish_reason == "length":
+        log.warning(f"  ⚠ 摘要超过 {MAX_SUMMARY_TOKENS} tokens 被截断: {title[:50]}")
+    
+    await cache_set(key, summary, total_tokens)
+    return summary, total_tokens
+
+
+async def generate_summaries_batch(client: AsyncOpenAI, prompt: str, articles: list[dict],
+                                   limiter: AsyncLimiter | None = None) -> list[tuple[str, int] | SummaryGenerationError]:
+    """
+    把多篇文章打包进一次请求生成摘要，减少请求次数和提示词的重复输入
+    模型以 JSON 返回 {"summaries": [{"id": 编号, "summary": 摘要}]}，实际消耗的 token 按摘要长度分摊到各篇
+    articles 应为内容非空且未命中缓存的文章（由 main_async 预先过滤）；批量结果中缺失或无法解析的文章单独重新生成
     
-    last_error = None
+    Returns:
+        与 articles 一一对应的列表，成功的文章为 (摘要文本, 预估token数)，
+        生成失败的文章为对应的 SummaryGenerationError，其余文章不受影响
+    """
+    results = [None] * len(articles)
+    pending = [  # (文章下标, 缓存键)
+        (idx, cache_key(prompt, article.get("title", "无标题"), article["content"]))
+        for idx, article in enumerate(articles)
+    ]
     
-    for attempt in range(MAX_RETRIES):
+    if len(pending) == 1:
+        idx, _ = pending[0]
         try:
-            response = client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=4096,
-                temperature=0.2,
-                timeout=API_TIMEOUT,
-            )
-            
-            summary = response.choices[0].message.content.strip()
-            
-            # 尝试从响应获取实际 token 数，否则估算
-            if hasattr(response, 'usage') and response.usage:
-                total_tokens = response.usage.total_tokens
-            else:
-                # 粗略估算：输入 + 输出
-                total_tokens = estimate_tokens(user_message) + estimate_tokens(summary)
-            
-            return summary, total_tokens
-        
-        except Exception as e:
-            last_error = e
-            error_msg = str(e).lower()
-            
-            # 判断是否是超时或网络相关错误，进行重试
-            if 'timeout' in error_msg or 'timed out' in error_msg or 'connection' in error_msg:
-                print(f"  ⚠ API 请求超时，第 {attempt + 1}/{MAX_RETRIES} 次重试...")
-                time.sleep(RETRY_DELAY)
-                continue
-            else:
-                # 其他错误直接抛出
-                raise SummaryGenerationError(f"生成摘要失败: {e}")
-    
-    # 重试次数用完仍然失败
-    raise SummaryGenerationError(f"生成摘要失败（重试 {MAX_RETRIES} 次后）: {last_error}")
-
-
-def format_summary_output(articles_with_summary: list[dict], date_str: str) -> str:
-    """格式化摘要输出"""
-    lines = []
+            results[idx] = await generate_summary(client, prompt, articles[idx], limiter)
+        except SummaryGenerationError as e:
+            results[idx] = e
+        return results
+    if not pending:
+        return results
+    
+    blocks = []
+    for n, (idx, _) in enumerate(pending, 1):
+        article = articles[idx]
+        blocks.append(f"### Article {n}\n标题：{article.get('title', '无标题')}\n\n正文：\n{truncate_content(article['content'])}")
+    system_message = f"{prompt}\n\n{BATCH_INSTRUCTION}"
+    user_message = "\n\n".join(blocks)
+    
+    try:
+        response = await create_completion(
+            client, system_message, user_message,
+            limiter=limiter,
+            max_tokens=min(MAX_SUMMARY_TOKENS * len(pending), MAX_BATCH_OUTPUT_TOKENS),
+            response_format={"type": "json_object"},
+        )
+    except SummaryGenerationError as e:
+        for idx, _ in pending:
+            results[idx] = e
+        return results
+    # 响应为空时按解析失败处理，下面逐篇重新生成
+    output = (response.choices[0].message.content if response.choices else None) or ""
+    total_tokens = usage_tokens(response, (system_message, user_message), output)
+    
+    summaries = {}
+    try:
+        parsed = orjson.loads(output) if orjson is not None else json.loads(output)
+        for item in parsed["summaries"]:
+            summaries[int(item["id"])] = str(item["summary"]).strip()
+    except (ValueError, KeyError, TypeError) as e:
+        log.warning(f"  ⚠ 批量摘要结果解析失败，改为逐篇生成: {e}")
+    
+    # 一篇都没解析出来时，这次请求的 token 记到第一篇重新生成的文章上（生成失败也照记）
+    unassigned_tokens = 0 if summaries else total_tokens
+    summary_chars = sum(len(summaries.get(n, "")) for n in range(1, len(pending) + 1)) or 1
+    assigned_chars = 0
+    assigned_tokens = 0
+    
+    for n, (idx, key) in enumerate(pending, 1):
+        summary = summaries.get(n)
+        if not summary:
+            try:
+                summary, tokens = await generate_summary(client, prompt, articles[idx], limiter)
+                results[idx] = (summary, tokens + unassigned_tokens)
+            except SummaryGenerationError as e:
+                e.tokens += unassigned_tokens
+                results[idx] = e
+            unassigned_tokens = 0
+            continue
+        # 按累计长度取整，保证各篇分摊的 token 之和等于实际消耗
+        assigned_chars += len(summary)
+        tokens = round(total_tokens * assigned_chars / summary_chars) - assigned_tokens
+        assigned_tokens += tokens
+        await cache_set(key, summary, tokens)
+        results[idx] = (summary, tokens)
+    
+    return results
+
+
+def write_summary_output(fh, articles_with_summary: list[dict], date_str: str):
+    """格式化摘要输出，逐篇写入文件，避免先拼接出整个文件内容"""
     separator = "\n" + "=" * 20 + "\n"
     
     # 解析日期字符串 (YYYYMMDD -> xxxx年xx月xx日)
@@ -161,6 +416,10 @@ def format_summary_output(articles_with_summary: list[dict], date_str: str) -> s
     day = date_str[6:8].lstrip('0')    # 去掉前导零
     formatted_date = f"{year}年{month}月{day}日"
     
+    # 写入头部信息
+    fh.write(f"以下为{formatted_date} The Athletic 要闻综述，共{len(articles_with_summary)}篇文章，内容综述如下：\n")
+    fh.write(separator)
+    
     for i, item in enumerate(articles_with_summary, 1):
         title = item.get("title", "无标题")
         summary = item.get("summary", "")
@@ -173,19 +432,19 @@ def format_summary_output(articles_with_summary: list[dict], date_str: str) -> s
 
 🔗 原文链接：{url}"""
         
-        lines.append(article_block)
-    
-    # 添加头部信息
-    header = f"以下为{formatted_date} The Athletic 要闻综述，共{len(articles_with_summary)}篇文章，内容综述如下：\n"
-    
-    return header + separator + separator.join(lines) + separator
+        fh.write(article_block)
+        fh.write(separator)
 
 
-def main():
-    """主函数"""
+async def main_async():
+    """主函数（异步）"""
     # 解析命令行参数
     parser = argparse.ArgumentParser(description="文章摘要生成器")
-    parser.add_argument("--force", action="store_true", help="强制重新生成摘要（即使已存在）")
+    parser.add_argument("--force", action="store_true", help="摘要文件已存在时仍重新输出（已缓存的摘要直接复用，不重新请求）")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help=f"每次请求打包的文章数（默认 {DEFAULT_BATCH_SIZE}，1 表示逐篇请求）")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_RPM,
+                        help=f"每分钟最多发出的 API 请求数（默认 {DEFAULT_RPM}，0 表示不限制）")
     args = parser.parse_args()
     
     # 检查 API 密钥
@@ -201,7 +460,7 @@ def main():
     output_file = SUMMARY_DIR / f"{date_str}_summary.txt"
     if output_file.exists() and not args.force:
         print(f"摘要文件已存在: {output_file}")
-        print(f"如需重新生成，请使用 --force 参数")
+        print("如需重新输出（复用已缓存的摘要），请使用 --force 参数")
         return
     
     print(f"=" * 60)
@@ -221,52 +480,89 @@ def main():
     
     print(f"✓ 找到 {len(articles)} 篇文章")
     
-    # 初始化 DeepSeek 客户端
-    client = OpenAI(
+    # 初始化 DeepSeek 客户端（所有请求共用一个 HTTP/2 连接池，连接数足够并发请求使用）
+    # 重试由 create_completion 统一处理，关闭 SDK 自带的重试
+    client = AsyncOpenAI(
         api_key=DEEPSEEK_API_KEY,
         base_url=DEEPSEEK_BASE_URL,
+        max_retries=0,
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=64, keepalive_expiry=60),
+            timeout=httpx.Timeout(API_TIMEOUT),
+        ),
     )
     
-    # 逐篇生成摘要
+    # 每 batch_size 篇文章打包成一次请求，并发进行的请求数不超过 MAX_CONCURRENCY
     print("\n开始生成摘要...")
     print("-" * 40)
     
-    articles_with_summary = []
+    total = len(articles)
+    results = [None] * total
+    
+    # 空文章和已有摘要（上次运行中途失败前已生成）的文章直接取结果，不进入待处理列表，
+    # 这样打包时每批都是真正需要请求的文章
+    pending = []
+    for i, article in enumerate(articles):
+        content = article.get("content", "")
+        if not content:
+            results[i] = (EMPTY_CONTENT_SUMMARY, 0)
+            continue
+        cached = cache_get(cache_key(prompt, article.get("title", "无标题"), content))
+        if cached is not None:
+            results[i] = (cached[0], 0)
+            continue
+        pending.append(i)
+    if len(pending) < total:
+        print(f"✓ {total - len(pending)} 篇文章已有摘要或内容为空，跳过请求")
+    
+    batch_size = max(1, args.batch_size)
+    batches = [pending[start:start + batch_size] for start in range(0, len(pending), batch_size)]
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    limiter = AsyncLimiter(args.rpm, 60) if args.rpm > 0 else None
+    
+    async def _summarize(batch: list[int]):
+        async with semaphore:
+            for i in batch:
+                log.info(f"[{i + 1}/{total}] {articles[i].get('title', '无标题')[:50]}...")
+            result = await generate_summaries_batch(client, prompt, [articles[i] for i in batch], limiter)
+            for i, item in zip(batch, result):
+                results[i] = item
+            done = [str(i + 1) for i, item in zip(batch, result) if not isinstance(item, SummaryGenerationError)]
+            if done:
+                log.info(f"  ✓ 第 {'、'.join(done)} 篇摘要生成完成（共 {total} 篇）")
     
+    listener = start_progress_log()
+    try:
+        async with client:
+            await asyncio.gather(*(_summarize(batch) for batch in batches))
+    finally:
+        listener.stop()
+    
+    # 某篇文章失败不影响其他文章，失败的文章用占位文字输出，最后统一报告
+    failures = []  # (文章标题, 错误信息)
+    for i, result in enumerate(results):
+        if isinstance(result, SummaryGenerationError):
+            results[i] = (FAILED_SUMMARY, result.tokens)
+            failures.append((articles[i].get("title", "无标题"), str(result)))
+    
+    articles_with_summary = []
     total_tokens = 0
     
-    for i, article in enumerate(articles, 1):
-        title = article.get("title", "无标题")[:50]
-        print(f"[{i}/{len(articles)}] {title}...")
-        
-        try:
-            summary, tokens = generate_summary(client, prompt, article)
-            total_tokens += tokens
-        except SummaryGenerationError as e:
-            print(f"\n" + "!" * 60)
-            print(f"❌ 错误: {e}")
-            print(f"❌ 文章: {article.get('title', '无标题')}")
-            print(f"❌ 流程中断，请检查网络连接或 API 状态后重试")
-            print("!" * 60)
-            sys.exit(1)
-        
+    for article, (summary, tokens) in zip(articles, results):
+        total_tokens += tokens
         articles_with_summary.append({
             "title": article.get("title", "无标题"),
             "url": article.get("url", ""),
             "summary": summary,
         })
-        
-        print(f"  ✓ 摘要生成完成")
     
     # 保存摘要文件
     output_file = SUMMARY_DIR / f"{date_str}_summary.txt"
-    output_content = format_summary_output(articles_with_summary, date_str)
-    
-    # 在末尾添加 token 消耗统计
-    output_content += f"本次预计消耗 Token 数：{total_tokens:,}\n"
-    
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(output_content)
+    with open(output_file, "w", encoding="utf-8", buffering=1 << 20) as f:
+        write_summary_output(f, articles_with_summary, date_str)
+        # 在末尾添加 token 消耗统计
+        f.write(f"本次预计消耗 Token 数：{total_tokens:,}\n")
     
     print("\n" + "=" * 60)
     print(f"✓ 摘要生成完成!")
@@ -274,6 +570,20 @@ def main():
     print(f"  - 预计消耗 Token: {total_tokens:,}")
     print(f"  - 输出文件: {output_file.absolute()}")
     print("=" * 60)
+    
+    if failures:
+        print("\n" + "!" * 60)
+        print(f"❌ {len(failures)} 篇文章摘要生成失败：")
+        for title, error in failures:
+            print(f"  - {title[:50]}: {error}")
+        print("❌ 请检查网络连接或 API 状态后使用 --force 重新运行（已生成的摘要会直接命中缓存）")
+        print("!" * 60)
+        sys.exit(2)
+
+
+def main():
+    """主函数"""
+    asyncio.run(main_async())
 
 
 if __name__ == "__main__":